@@ -5,14 +5,89 @@ financial data with calculated indicators to CSV format.
 """
 
 import logging
+import os
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, overload
 
 import polars as pl
 
 from note.libs import indicators
 
+# Eager frames at or below this row count are written directly with
+# write_csv; larger frames (and all lazy input) stream through sink_csv
+# so peak memory stays bounded by chunk size, not table size
+SINK_ROW_THRESHOLD = 10_000
+
+# Explicit schema mirroring the keys produced by data_fetcher. Passing it
+# to the DataFrame constructor takes the fast columnar path instead of
+# inferring dtypes row by row, and keeps the output schema stable even
+# when some tickers are missing fields
+TICKER_SCHEMA: dict[str, type[pl.DataType]] = {
+    "ticker": pl.Utf8,
+    "market_cap": pl.Float64,
+    "total_cash": pl.Float64,
+    "total_debt": pl.Float64,
+    "total_assets": pl.Float64,
+    "book_value": pl.Float64,
+    "operating_cash_flow": pl.Float64,
+    "capex": pl.Float64,
+    "ebit": pl.Float64,
+    "gross_profit": pl.Float64,
+    "net_income": pl.Float64,
+    "dividend_yield": pl.Float64,
+    "trailing_pe": pl.Float64,
+    "total_revenue": pl.Float64,
+    "earnings_growth": pl.Float64,
+    "payout_ratio": pl.Float64,
+    "earnings_y0": pl.Float64,
+    "earnings_y1": pl.Float64,
+    "earnings_y2": pl.Float64,
+}
+
+
+@lru_cache(maxsize=4)
+def _read_ticker_master(tsv_path: str, mtime: float) -> pl.DataFrame:
+    """Parse the TSV master file. Cached per (path, mtime) via lru_cache.
+
+    infer_schema_length=0 reads every column as Utf8: all master columns
+    are codes/labels, so this skips type inference entirely and keeps
+    numeric-looking ticker codes as strings (matching the fetch results
+    they are joined against). The file goes through the scan_csv lazy
+    reader so the parse runs in the streaming engine; the result is
+    materialized here because ticker extraction and the metadata merge
+    both reuse it. rechunk() yields one contiguous Arrow chunk, which
+    keeps the metadata join's probe loop cache-friendly.
+    """
+    return (
+        pl.scan_csv(
+            tsv_path,
+            separator="\t",
+            has_header=True,
+            infer_schema_length=0,
+        )
+        .collect()
+        .rechunk()
+    )
+
+
+def load_ticker_master(tsv_path: str) -> pl.DataFrame:
+    """Load the ticker master TSV, parsing each file at most once.
+
+    The export pipeline reads the same TSV twice (ticker extraction, then
+    metadata merge); caching on (path, mtime) means the second access is a
+    dictionary lookup instead of a full CSV parse, while edits to the file
+    invalidate the entry automatically.
+
+    Args:
+        tsv_path: Path to TSV master file
+
+    Returns:
+        Parsed DataFrame (shared cached instance; do not mutate)
+    """
+    return _read_ticker_master(str(tsv_path), os.path.getmtime(tsv_path))
+
 
 def filter_individual_stocks(df: pl.DataFrame) -> pl.DataFrame:
     """Filter out ETF/ETN from DataFrame, keeping only individual stocks.
@@ -31,9 +106,9 @@ def filter_individual_stocks(df: pl.DataFrame) -> pl.DataFrame:
         logging.warning("Market category column not found, returning all data")
         return df
 
-    total_count = len(df)
+    total_count = df.height
     filtered_df = df.filter(pl.col(market_col) != "ETF・ETN")
-    individual_count = len(filtered_df)
+    individual_count = filtered_df.height
     etf_count = total_count - individual_count
 
     logging.info(
@@ -43,13 +118,17 @@ def filter_individual_stocks(df: pl.DataFrame) -> pl.DataFrame:
     return filtered_df
 
 
-def read_tickers_from_tsv(
+def read_ticker_series(
     tsv_path: str,
     ticker_column: int = 1,
     limit: Optional[int] = None,
     exclude_etf: bool = True,
-) -> list[str]:
-    """Read ticker codes from TSV file.
+) -> pl.Series:
+    """Read ticker codes from TSV file as a polars Series.
+
+    Returning the Arrow-backed Series avoids allocating one Python string
+    per ticker; vectorized consumers (e.g. data_fetcher.normalize_tickers)
+    can operate on it directly. Use read_tickers_from_tsv for a plain list.
 
     Args:
         tsv_path: Path to TSV file
@@ -58,41 +137,86 @@ def read_tickers_from_tsv(
         exclude_etf: Exclude ETF/ETN from results (default: True)
 
     Returns:
-        List of ticker codes
+        Series of ticker codes (empty Series on failure)
     """
     try:
-        df = pl.read_csv(tsv_path, separator="\t", has_header=True)
-
-        # Filter out ETF/ETN if requested
-        if exclude_etf:
-            df = filter_individual_stocks(df)
+        # Project from the cached master frame; the file itself is parsed
+        # at most once per process (see load_ticker_master)
+        lazy_df = load_ticker_master(tsv_path).lazy()
+        columns = lazy_df.collect_schema().names()
 
         # Get column by index
-        if ticker_column >= len(df.columns):
+        if ticker_column >= len(columns):
             logging.error(
-                f"Column index {ticker_column} out of range. File has {len(df.columns)} columns."
+                f"Column index {ticker_column} out of range. File has {len(columns)} columns."
             )
-            return []
+            return pl.Series("ticker", [])
 
-        column_name = df.columns[ticker_column]
-        tickers = df[column_name].drop_nulls().to_list()
+        ticker_col = columns[ticker_column]
 
-        # Apply limit if specified
+        # Filter out ETF/ETN if requested (market category is column 3)
+        if exclude_etf and len(columns) > 3:
+            market_col = columns[3]
+            lazy_df = lazy_df.select([ticker_col, market_col]).filter(
+                pl.col(market_col) != "ETF・ETN"
+            )
+        else:
+            if exclude_etf:
+                logging.warning("Market category column not found, returning all data")
+            lazy_df = lazy_df.select([ticker_col])
+
+        lazy_df = lazy_df.drop_nulls(ticker_col)
+
+        # Apply limit inside the plan so slice pushdown stops the parse early
         if limit is not None and limit > 0:
-            tickers = tickers[:limit]
+            lazy_df = lazy_df.head(limit)
             logging.info(f"Limited to first {limit} tickers")
 
+        tickers = lazy_df.collect().to_series(0)
+
         logging.info(f"Read {len(tickers)} ticker codes from {tsv_path}")
         return tickers
 
     except Exception as e:
         logging.error(f"Failed to read TSV file {tsv_path}: {e}")
-        return []
+        return pl.Series("ticker", [])
+
+
+def read_tickers_from_tsv(
+    tsv_path: str,
+    ticker_column: int = 1,
+    limit: Optional[int] = None,
+    exclude_etf: bool = True,
+) -> list[str]:
+    """Read ticker codes from TSV file.
+
+    Thin wrapper around read_ticker_series for callers that want a plain
+    Python list.
+
+    Args:
+        tsv_path: Path to TSV file
+        ticker_column: Column index for ticker codes (default: 1 for 2nd column)
+        limit: Maximum number of tickers to read (default: None for all)
+        exclude_etf: Exclude ETF/ETN from results (default: True)
+
+    Returns:
+        List of ticker codes
+    """
+    return read_ticker_series(
+        tsv_path,
+        ticker_column=ticker_column,
+        limit=limit,
+        exclude_etf=exclude_etf,
+    ).to_list()
 
 
 def build_dataframe(ticker_data_list: list[dict]) -> pl.DataFrame:
     """Build polars DataFrame from list of ticker data dictionaries.
 
+    Columns follow TICKER_SCHEMA: dtypes are declared up front so polars
+    skips per-row type inference, and fields missing from a dict become
+    null instead of shifting the schema.
+
     Args:
         ticker_data_list: List of dictionaries containing financial data
 
@@ -110,33 +234,59 @@ def build_dataframe(ticker_data_list: list[dict]) -> pl.DataFrame:
         logging.warning("No valid data after filtering, returning empty DataFrame")
         return pl.DataFrame()
 
-    # Create DataFrame from list of dictionaries
-    df = pl.DataFrame(valid_data)
-    logging.info(f"Built DataFrame with {len(df)} rows and {len(df.columns)} columns")
+    # Create DataFrame from list of dictionaries with an explicit schema
+    df = pl.DataFrame(valid_data, schema=TICKER_SCHEMA)
+    logging.info(f"Built DataFrame with {df.height} rows and {df.width} columns")
 
     return df
 
 
+@overload
+def merge_tsv_metadata(
+    df: pl.DataFrame, tsv_path: str | pl.DataFrame, ticker_column: int = 1
+) -> pl.DataFrame: ...
+
+
+@overload
 def merge_tsv_metadata(
-    df: pl.DataFrame, tsv_path: str, ticker_column: int = 1
-) -> pl.DataFrame:
+    df: pl.LazyFrame, tsv_path: str | pl.DataFrame, ticker_column: int = 1
+) -> pl.LazyFrame: ...
+
+
+def merge_tsv_metadata(
+    df: pl.DataFrame | pl.LazyFrame,
+    tsv_path: str | pl.DataFrame,
+    ticker_column: int = 1,
+) -> pl.DataFrame | pl.LazyFrame:
     """Merge TSV metadata (stock name, sector, market category) into DataFrame.
 
+    Accepts either an eager DataFrame or a LazyFrame. Lazy input stays lazy
+    so the whole export pipeline can fuse into one plan with a single
+    collect; eager input is collected before returning, as before.
+
     Args:
-        df: DataFrame with ticker column
-        tsv_path: Path to TSV file containing metadata
+        df: DataFrame or LazyFrame with ticker column
+        tsv_path: Path to TSV file containing metadata, or an
+                  already-parsed master DataFrame (skips the file lookup)
         ticker_column: Column index for ticker codes (default: 1 for 2nd column)
 
     Returns:
-        DataFrame with additional metadata columns from TSV
+        Frame with additional metadata columns from TSV (same kind as input)
     """
-    if df.is_empty():
+    eager_input = isinstance(df, pl.DataFrame)
+    if isinstance(df, pl.DataFrame) and df.is_empty():
         logging.warning("Empty DataFrame, skipping metadata merge")
         return df
 
     try:
-        # Read TSV file
-        tsv_df = pl.read_csv(tsv_path, separator="\t", has_header=True)
+        # Use the caller-supplied master frame, or project from the cached
+        # one; either way a path is parsed at most once per process (see
+        # load_ticker_master)
+        if isinstance(tsv_path, pl.DataFrame):
+            tsv_lazy = tsv_path.lazy()
+        else:
+            tsv_lazy = load_ticker_master(tsv_path).lazy()
+        tsv_columns = tsv_lazy.collect_schema().names()
 
         # Select relevant columns:
         # - Column 1 (index 1): ticker code
@@ -145,69 +295,106 @@ def merge_tsv_metadata(
         # - Column 5 (index 5): 33-sector category
         # - Column 7 (index 7): 17-sector category
         metadata_cols = [
-            tsv_df.columns[1],  # ticker code
-            tsv_df.columns[2],  # stock name
-            tsv_df.columns[3],  # market category
-            tsv_df.columns[5],  # 33-sector category
-            tsv_df.columns[7],  # 17-sector category
+            tsv_columns[1],  # ticker code
+            tsv_columns[2],  # stock name
+            tsv_columns[3],  # market category
+            tsv_columns[5],  # 33-sector category
+            tsv_columns[7],  # 17-sector category
         ]
 
-        tsv_metadata = tsv_df.select(metadata_cols)
+        ticker_col_name = metadata_cols[0]
 
-        # Rename columns to English
-        ticker_col_name = tsv_metadata.columns[0]
-        tsv_metadata = tsv_metadata.rename(
+        # Rename columns to English and factorize the join key: a
+        # Categorical key joins on u32 dictionary codes instead of UTF-8
+        # strings
+        tsv_metadata = tsv_lazy.select(metadata_cols).rename(
             {
-                tsv_metadata.columns[1]: "stock_name",
-                tsv_metadata.columns[2]: "market_category",
-                tsv_metadata.columns[3]: "sector_33",
-                tsv_metadata.columns[4]: "sector_17",
+                metadata_cols[1]: "stock_name",
+                metadata_cols[2]: "market_category",
+                metadata_cols[3]: "sector_33",
+                metadata_cols[4]: "sector_17",
             }
         )
 
-        # Join with main DataFrame on ticker column
-        merged_df = df.join(
-            tsv_metadata, left_on="ticker", right_on=ticker_col_name, how="left"
+        # Market/sector categories are low-cardinality (~4/33/17 distinct
+        # values): store them as u32 dictionary codes instead of one heap
+        # string per row. CSV export decodes them back to strings
+        tsv_metadata = tsv_metadata.with_columns(
+            [
+                pl.col(c).cast(pl.Categorical)
+                for c in ("market_category", "sector_33", "sector_17")
+            ]
         )
 
-        logging.info(
-            f"Merged TSV metadata. Added {len(merged_df.columns) - len(df.columns)} columns"
+        merged = (
+            df.lazy()
+            .with_columns(pl.col("ticker").cast(pl.Utf8).cast(pl.Categorical))
+            .join(
+                tsv_metadata.with_columns(
+                    pl.col(ticker_col_name).cast(pl.Utf8).cast(pl.Categorical)
+                ),
+                left_on="ticker",
+                right_on=ticker_col_name,
+                how="left",
+            )
+            # Restore the plain string dtype expected by downstream export
+            .with_columns(pl.col("ticker").cast(pl.Utf8))
         )
 
-        return merged_df
+        logging.info("Merged TSV metadata (stock name, market category, sectors)")
+
+        return merged.collect() if eager_input else merged
 
     except Exception as e:
         logging.error(f"Failed to merge TSV metadata: {e}")
         return df
 
 
-def add_indicators_to_dataframe(df: pl.DataFrame) -> pl.DataFrame:
+@overload
+def add_indicators_to_dataframe(df: pl.DataFrame) -> pl.DataFrame: ...
+
+
+@overload
+def add_indicators_to_dataframe(df: pl.LazyFrame) -> pl.LazyFrame: ...
+
+
+def add_indicators_to_dataframe(
+    df: pl.DataFrame | pl.LazyFrame,
+) -> pl.DataFrame | pl.LazyFrame:
     """Add calculated fundamental indicators to DataFrame.
 
+    Accepts either an eager DataFrame or a LazyFrame; lazy input stays lazy.
+
     Args:
-        df: DataFrame with raw financial data
+        df: DataFrame or LazyFrame with raw financial data
 
     Returns:
-        DataFrame with additional indicator columns
+        Frame with additional indicator columns (same kind as input)
     """
-    if df.is_empty():
+    eager_input = isinstance(df, pl.DataFrame)
+    if isinstance(df, pl.DataFrame) and df.is_empty():
         logging.warning("Empty DataFrame, skipping indicator calculation")
         return df
 
     try:
         # Calculate indicators using note/libs/indicators.py functions
         # Note: ROIC, CROIC, and Piotroski F-score require data not available from yfinance
-        # First calculate enterprise value, then use it for EV-based ratios
-        df_with_ev = df.with_columns(
+        # Enterprise value is a shared Expr (not an intermediate column), so
+        # all indicators go into one with_columns pass: polars' common
+        # subexpression elimination evaluates the EV subtree once, and the
+        # base columns are scanned a single time instead of three
+        enterprise_value = indicators.calculate_enterprise_value(
+            pl.col("market_cap"), pl.col("total_debt"), pl.col("total_cash")
+        )
+
+        df_with_indicators = df.lazy().with_columns(
             [
                 # Net Cash Ratio
                 indicators.calculate_net_cash_ratio(
                     pl.col("total_cash"), pl.col("total_debt"), pl.col("market_cap")
                 ).alias("net_cash_ratio"),
-                # Enterprise Value (needed for EV/EBIT and EV/FCF)
-                indicators.calculate_enterprise_value(
-                    pl.col("market_cap"), pl.col("total_debt"), pl.col("total_cash")
-                ).alias("enterprise_value"),
+                # Enterprise Value (shared with EV/EBIT and EV/FCF below)
+                enterprise_value.alias("enterprise_value"),
                 # Gross Profitability
                 indicators.calculate_gross_profitability(
                     pl.col("gross_profit"), pl.col("total_assets")
@@ -222,86 +409,100 @@ def add_indicators_to_dataframe(df: pl.DataFrame) -> pl.DataFrame:
                 indicators.calculate_pbr(
                     pl.col("market_cap"), pl.col("book_value")
                 ).alias("pbr"),
-            ]
-        )
-
-        # Now add EV-based ratios using the calculated enterprise_value
-        df_with_ev_ratios = df_with_ev.with_columns(
-            [
                 # EV/EBIT
                 indicators.calculate_ev_ebit(
-                    pl.col("enterprise_value"),
+                    enterprise_value,
                     pl.col("ebit"),
                 ).alias("ev_ebit"),
                 # EV/FCF
                 indicators.calculate_ev_fcf(
-                    pl.col("enterprise_value"),
+                    enterprise_value,
                     pl.col("operating_cash_flow"),
                     pl.col("capex"),
                 ).alias("ev_fcf"),
-            ]
-        )
-
-        # Add valuation metrics for value/dividend investing
-        df_with_indicators = df_with_ev_ratios.with_columns(
-            [
                 # PSR (Price to Sales Ratio) = Market Cap / Total Revenue
-                (pl.col("market_cap") / pl.col("total_revenue")).alias("psr"),
+                # safe_div keeps zero/null revenue from producing inf
+                indicators.safe_div(
+                    pl.col("market_cap"), pl.col("total_revenue")
+                ).alias("psr"),
                 # PEG Ratio = PER / Earnings Growth Rate (%)
                 # earnings_growth is decimal (0.15 = 15%), convert to percentage
-                (pl.col("trailing_pe") / (pl.col("earnings_growth") * 100)).alias(
-                    "peg_ratio"
-                ),
+                indicators.safe_div(
+                    pl.col("trailing_pe"), pl.col("earnings_growth") * 100
+                ).alias("peg_ratio"),
             ]
         )
 
-        logging.info(
-            f"Added indicators to DataFrame. Total columns: {len(df_with_indicators.columns)}"
-        )
-        return df_with_indicators
+        logging.info("Added fundamental indicator columns to DataFrame")
+        return df_with_indicators.collect() if eager_input else df_with_indicators
 
     except Exception as e:
         logging.error(f"Failed to calculate indicators: {e}")
         return df
 
 
-def add_earnings_flags(df: pl.DataFrame) -> pl.DataFrame:
+@overload
+def add_earnings_flags(df: pl.DataFrame) -> pl.DataFrame: ...
+
+
+@overload
+def add_earnings_flags(df: pl.LazyFrame) -> pl.LazyFrame: ...
+
+
+def add_earnings_flags(
+    df: pl.DataFrame | pl.LazyFrame,
+) -> pl.DataFrame | pl.LazyFrame:
     """Add earnings growth flag based on 3-year consecutive earnings growth.
 
+    Accepts either an eager DataFrame or a LazyFrame; lazy input stays lazy.
+
     Args:
-        df: DataFrame with earnings_y0, earnings_y1, earnings_y2 columns
+        df: DataFrame or LazyFrame with earnings_y0, earnings_y1, earnings_y2 columns
 
     Returns:
-        DataFrame with additional consecutive_earnings_growth column (bool)
+        Frame with additional consecutive_earnings_growth column (bool)
     """
-    if df.is_empty():
+    eager_input = isinstance(df, pl.DataFrame)
+    if isinstance(df, pl.DataFrame) and df.is_empty():
         logging.warning("Empty DataFrame, skipping earnings flags calculation")
         return df
 
     try:
         # Calculate 3-year consecutive earnings growth flag
-        # True if: earnings_y0 > earnings_y1 > earnings_y2 (all not null)
-        df_with_flag = df.with_columns(
+        # True if: earnings_y0 > earnings_y1 > earnings_y2 (all not null).
+        # Kleene logic already yields null when either comparison side is
+        # null, so fill_null(False) replaces the three explicit null checks
+        # and their bitmap AND passes
+        df_with_flag = df.lazy().with_columns(
             [
                 (
-                    (pl.col("earnings_y0").is_not_null())
-                    & (pl.col("earnings_y1").is_not_null())
-                    & (pl.col("earnings_y2").is_not_null())
-                    & (pl.col("earnings_y0") > pl.col("earnings_y1"))
+                    (pl.col("earnings_y0") > pl.col("earnings_y1"))
                     & (pl.col("earnings_y1") > pl.col("earnings_y2"))
-                ).alias("consecutive_earnings_growth")
+                )
+                .fill_null(False)
+                .alias("consecutive_earnings_growth")
             ]
         )
 
         logging.info("Added consecutive earnings growth flag")
-        return df_with_flag
+        return df_with_flag.collect() if eager_input else df_with_flag
 
     except Exception as e:
         logging.error(f"Failed to add earnings flags: {e}")
         return df
 
 
-def reorder_columns(df: pl.DataFrame) -> pl.DataFrame:
+@overload
+def reorder_columns(df: pl.DataFrame) -> pl.DataFrame: ...
+
+
+@overload
+def reorder_columns(df: pl.LazyFrame) -> pl.LazyFrame: ...
+
+
+def reorder_columns(
+    df: pl.DataFrame | pl.LazyFrame,
+) -> pl.DataFrame | pl.LazyFrame:
     """Reorder DataFrame columns for better readability.
 
     Column order:
@@ -313,15 +514,21 @@ def reorder_columns(df: pl.DataFrame) -> pl.DataFrame:
     6. Raw financial data: market_cap, total_cash, etc.
     7. Calculated indicators: net_cash_ratio, ev, etc.
 
+    Accepts either an eager DataFrame or a LazyFrame; the select is a pure
+    projection, so lazy input stays lazy.
+
     Args:
-        df: DataFrame to reorder
+        df: DataFrame or LazyFrame to reorder
 
     Returns:
-        DataFrame with reordered columns
+        Frame with reordered columns (same kind as input)
     """
-    if df.is_empty():
+    if isinstance(df, pl.DataFrame) and df.is_empty():
         return df
 
+    # Schema lookup works for both eager and lazy frames
+    all_columns = df.collect_schema().names()
+
     # Define column order groups
     priority_cols = ["ticker"]
     metadata_cols = ["stock_name", "market_category", "sector_33", "sector_17"]
@@ -334,24 +541,22 @@ def reorder_columns(df: pl.DataFrame) -> pl.DataFrame:
     ]
     valuation_cols = ["trailing_pe", "psr", "peg_ratio"]
 
+    # Set-based membership checks: O(1) lookups instead of rescanning the
+    # column list (and re-concatenating the group lists) per column
+    columns_set = set(all_columns)
+
     # Get all existing columns from each group
-    existing_priority = [c for c in priority_cols if c in df.columns]
-    existing_metadata = [c for c in metadata_cols if c in df.columns]
-    existing_dividend = [c for c in dividend_cols if c in df.columns]
-    existing_earnings = [c for c in earnings_cols if c in df.columns]
-    existing_valuation = [c for c in valuation_cols if c in df.columns]
+    existing_priority = [c for c in priority_cols if c in columns_set]
+    existing_metadata = [c for c in metadata_cols if c in columns_set]
+    existing_dividend = [c for c in dividend_cols if c in columns_set]
+    existing_earnings = [c for c in earnings_cols if c in columns_set]
+    existing_valuation = [c for c in valuation_cols if c in columns_set]
 
     # All other columns (preserve their order)
-    other_cols = [
-        c
-        for c in df.columns
-        if c
-        not in existing_priority
-        + existing_metadata
-        + existing_dividend
-        + existing_earnings
-        + existing_valuation
-    ]
+    grouped_cols = set(
+        priority_cols + metadata_cols + dividend_cols + earnings_cols + valuation_cols
+    )
+    other_cols = [c for c in all_columns if c not in grouped_cols]
 
     # Combine in desired order
     new_order = (
@@ -366,11 +571,18 @@ def reorder_columns(df: pl.DataFrame) -> pl.DataFrame:
     return df.select(new_order)
 
 
-def export_to_csv(df: pl.DataFrame, output_dir: str = "note/data/exports/") -> str:
+def export_to_csv(
+    df: pl.DataFrame | pl.LazyFrame, output_dir: str = "note/data/exports/"
+) -> str:
     """Export DataFrame to CSV with timestamp in filename.
 
+    Lazy input fuses the write with the upstream plan via sink_csv, so
+    the final wide frame is never fully materialized. Eager input above
+    SINK_ROW_THRESHOLD is streamed the same way; small eager frames use
+    write_csv directly, skipping the plan construction overhead.
+
     Args:
-        df: Polars DataFrame to export
+        df: Polars DataFrame or LazyFrame to export
         output_dir: Output directory path (default: note/data/exports/)
 
     Returns:
@@ -385,8 +597,10 @@ def export_to_csv(df: pl.DataFrame, output_dir: str = "note/data/exports/") -> s
     filename = f"stock_data_{timestamp}.csv"
     filepath = output_path / filename
 
-    # Export to CSV
-    df.write_csv(filepath)
-    logging.info(f"Exported {len(df)} rows to {filepath}")
+    if isinstance(df, pl.DataFrame) and df.height <= SINK_ROW_THRESHOLD:
+        df.write_csv(filepath)
+    else:
+        df.lazy().sink_csv(filepath)
+    logging.info(f"Exported CSV to {filepath}")
 
     return str(filepath)
@@ -4,19 +4,208 @@ This module provides functions to fetch stock financial data from yfinance API
 with robust error handling and exponential backoff retry logic.
 """
 
+import json
 import logging
+import shutil
+import threading
 import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
+import polars as pl
+import requests
 import yfinance as yf
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+# Transient network failures worth retrying; anything else (including
+# cancellation during threaded fetches) propagates to the caller
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.RequestException,
+    ConnectionError,
+    TimeoutError,
+)
 
-def fetch_ticker_data(ticker: str | int) -> dict:
+# One pooled HTTP session shared by every ticker handle: keep-alive reuses
+# TLS connections across tickers instead of paying one handshake each, and
+# the adapter retries transient 429/5xx responses at the transport layer
+# (application-level backoff in fetch_with_retry stays on top of this)
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+
+# Bound the number of in-flight yfinance requests so a large thread pool
+# does not trigger Yahoo rate limiting (HTTP 429)
+MAX_CONCURRENT_REQUESTS = 8
+_request_limiter = threading.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Disk cache for fetched data, keyed by (ticker, date). Fetch results are
+# stable within a trading day, so re-runs on the same day skip the network
+# entirely; date-keyed filenames make stale entries unreachable (TTL: 1 day)
+_CACHE_DIR = Path("note/.cache/yf")
+
+
+def _cache_path(bucket: str, ticker_str: str) -> Path:
+    """Build the cache file path for a ticker, keyed by today's date."""
+    return _CACHE_DIR / bucket / f"{ticker_str}_{date.today().isoformat()}.json"
+
+
+def _cache_read(bucket: str, ticker_str: str) -> Optional[dict]:
+    """Read a cached result for today, or None on miss/corruption."""
+    path = _cache_path(bucket, ticker_str)
+    if not path.exists():
+        return None
+    try:
+        # json.loads returns Any; entries are always dicts (see _cache_write)
+        cached: dict = json.loads(path.read_text(encoding="utf-8"))
+        logging.debug(f"Cache hit for {ticker_str} ({bucket})")
+        return cached
+    except (OSError, json.JSONDecodeError) as e:
+        logging.debug(f"Ignoring unreadable cache entry for {ticker_str}: {e}")
+        return None
+
+
+def _cache_write(bucket: str, ticker_str: str, data: dict) -> None:
+    """Store a fetch result on disk; cache failures are non-fatal."""
+    path = _cache_path(bucket, ticker_str)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    except OSError as e:
+        logging.debug(f"Failed to write cache entry for {ticker_str}: {e}")
+
+
+@lru_cache(maxsize=128)
+def get_ticker(symbol: str) -> yf.Ticker:
+    """Return a process-wide shared yf.Ticker handle for a symbol.
+
+    yf.Ticker objects lazily fetch and then memoize their attributes
+    (info, financials, ...), so reusing one handle per symbol means each
+    endpoint is hit at most once per process. This matters for repeated
+    calls within a run (info + earnings for the same ticker) and for
+    interactive marimo cells that re-execute with the same symbols.
+
+    Tests can reset the cache via get_ticker.cache_clear().
+
+    Args:
+        symbol: yfinance symbol (e.g. "7203.T")
+
+    Returns:
+        Cached yf.Ticker instance
+    """
+    return yf.Ticker(symbol, session=_SESSION)
+
+
+def clear_cache() -> None:
+    """Delete all cached fetch results.
+
+    Forces the next fetch of every ticker to hit the yfinance API again.
+    Used by the CLI --force-refresh flag.
+    """
+    if _CACHE_DIR.exists():
+        shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+        logging.info(f"Cleared yfinance disk cache at {_CACHE_DIR}")
+
+
+def normalize_tickers(tickers: Iterable[str | int]) -> list[tuple[str, str]]:
+    """Normalize ticker codes to yfinance symbols in one vectorized pass.
+
+    Numeric-only codes get the ".T" Tokyo exchange suffix appended. Doing
+    this once up front with a polars string kernel replaces the per-call
+    isdigit() check and f-string formatting inside the fetch loop.
+
+    Args:
+        tickers: Stock ticker codes (string or int)
+
+    Returns:
+        List of (original_ticker, yf_symbol) tuples in input order
+    """
+    originals = pl.Series("ticker", [str(t) for t in tickers], dtype=pl.Utf8)
+    symbols = (
+        originals.to_frame()
+        .select(
+            pl.when(pl.col("ticker").str.contains(r"^\d+$"))
+            .then(pl.col("ticker") + ".T")
+            .otherwise(pl.col("ticker"))
+        )
+        .to_series()
+    )
+    return list(zip(originals.to_list(), symbols.to_list()))
+
+
+def _extract_info_fields(ticker_str: str, info: dict) -> dict:
+    """Extract the exported financial fields from a yfinance info dict.
+
+    Returns empty dict {} if the info dict has no usable financial data.
+    """
+    data = {
+        "ticker": ticker_str,  # Always return as string
+        "market_cap": info.get("marketCap"),
+        "total_cash": info.get("totalCash"),
+        "total_debt": info.get("totalDebt"),
+        "total_assets": info.get("totalAssets"),
+        "book_value": info.get("bookValue"),
+        "operating_cash_flow": info.get("operatingCashflow"),
+        "capex": info.get("capitalExpenditures"),
+        "ebit": info.get("ebit"),
+        "gross_profit": info.get("grossProfits"),
+        "net_income": info.get("netIncomeToCommon"),
+        "dividend_yield": info.get("dividendYield"),
+        # Valuation metrics for value/dividend investing
+        "trailing_pe": info.get("trailingPE"),
+        "total_revenue": info.get("totalRevenue"),
+        "earnings_growth": info.get("earningsGrowth"),
+        "payout_ratio": info.get("payoutRatio"),
+    }
+
+    # Check if we got at least some data
+    non_null_values = sum(1 for v in data.values() if v is not None)
+    if non_null_values > 1:  # More than just ticker
+        # DEBUG, not INFO: with thousands of tickers on many threads the
+        # per-emit logging lock becomes a serialization point
+        logging.debug(
+            f"Successfully fetched data for {ticker_str} ({non_null_values} fields)"
+        )
+        return data
+    else:
+        logging.warning(f"No financial data available for {ticker_str}")
+        return {}
+
+
+def fetch_ticker_data(
+    ticker: str | int,
+    force_refresh: bool = False,
+    yf_symbol: Optional[str] = None,
+    stock: Optional[yf.Ticker] = None,
+) -> dict:
     """Fetch financial data for a single ticker from yfinance.
 
+    Results are cached on disk per (ticker, date), so repeated runs within
+    the same day are served locally without hitting the yfinance API.
+
     Args:
         ticker: Stock ticker code (e.g., "7203" or "7203.T" for Toyota)
                 Can be string or int. If numeric only, ".T" suffix is automatically added for Tokyo exchange
+        force_refresh: Bypass the disk cache and re-fetch (default: False)
+        yf_symbol: Pre-normalized yfinance symbol (e.g. from normalize_tickers).
+                   Skips the per-call suffix handling when provided
+        stock: Existing yf.Ticker handle to reuse. Without it the shared
+               get_ticker cache resolves the handle, so callers fetching
+               several endpoints for one symbol hit the same object either way
 
     Returns:
         Dictionary containing financial data fields:
@@ -38,71 +227,69 @@ def fetch_ticker_data(ticker: str | int) -> dict:
         # Convert to string if integer
         ticker_str = str(ticker)
 
+        # Serve from today's disk cache unless a refresh is forced
+        if not force_refresh:
+            cached = _cache_read("info", ticker_str)
+            if cached is not None:
+                return cached
+
         # Auto-append .T suffix for Japanese stocks (numeric-only tickers)
-        yf_ticker = ticker_str
-        if ticker_str.isdigit():
+        # unless the caller already normalized the symbol
+        yf_ticker = yf_symbol if yf_symbol is not None else ticker_str
+        if yf_symbol is None and ticker_str.isdigit():
             yf_ticker = f"{ticker_str}.T"
             logging.debug(f"Converting ticker {ticker_str} to {yf_ticker}")
 
-        stock = yf.Ticker(yf_ticker)
+        if stock is None:
+            stock = get_ticker(yf_ticker)
         info = stock.info
 
         # Extract financial metrics with safe gets
-        data = {
-            "ticker": ticker_str,  # Always return as string
-            "market_cap": info.get("marketCap"),
-            "total_cash": info.get("totalCash"),
-            "total_debt": info.get("totalDebt"),
-            "total_assets": info.get("totalAssets"),
-            "book_value": info.get("bookValue"),
-            "operating_cash_flow": info.get("operatingCashflow"),
-            "capex": info.get("capitalExpenditures"),
-            "ebit": info.get("ebit"),
-            "gross_profit": info.get("grossProfits"),
-            "net_income": info.get("netIncomeToCommon"),
-            "dividend_yield": info.get("dividendYield"),
-            # Valuation metrics for value/dividend investing
-            "trailing_pe": info.get("trailingPE"),
-            "total_revenue": info.get("totalRevenue"),
-            "earnings_growth": info.get("earningsGrowth"),
-            "payout_ratio": info.get("payoutRatio"),
-        }
+        data = _extract_info_fields(ticker_str, info)
 
-        # Check if we got at least some data
-        non_null_values = sum(1 for v in data.values() if v is not None)
-        if non_null_values > 1:  # More than just ticker
-            logging.info(
-                f"Successfully fetched data for {ticker_str} ({non_null_values} fields)"
-            )
-            return data
-        else:
-            logging.warning(f"No financial data available for {ticker_str}")
-            return {}
+        # Cache only successful fetches so empty results are retried
+        if data:
+            _cache_write("info", ticker_str, data)
+
+        return data
 
     except Exception as e:
         logging.error(f"Failed to fetch data for {ticker}: {e}")
         return {}
 
 
-def fetch_with_retry(ticker: str, max_retries: int = 3) -> Optional[dict]:
+def fetch_with_retry(
+    ticker: str | int, max_retries: int = 3, force_refresh: bool = False
+) -> Optional[dict]:
     """Fetch ticker data with exponential backoff retry logic.
 
     Retry strategy: exponential backoff with 1s, 2s, 4s wait times.
+    Only transient network errors (RETRYABLE_EXCEPTIONS) are retried;
+    other exceptions propagate so bugs and cancellations are not
+    silently swallowed.
 
     Args:
         ticker: Stock ticker code
         max_retries: Maximum number of retry attempts (default: 3)
+        force_refresh: Bypass the disk cache and re-fetch (default: False)
 
     Returns:
         Dictionary of financial data, or None if all retries fail
     """
     for attempt in range(max_retries):
         try:
-            data = fetch_ticker_data(ticker)
+            data = fetch_ticker_data(ticker, force_refresh=force_refresh)
             if data:  # If we got some data, return it
                 return data
-            # If empty dict, fall through to retry
-        except (ConnectionError, TimeoutError, Exception) as e:
+            # Empty dict: back off before the next attempt, same schedule
+            # as the exception path
+            if attempt < max_retries - 1:
+                wait_time = 2**attempt  # 1, 2, 4 seconds
+                logging.warning(
+                    f"Retry {attempt + 1}/{max_retries} for {ticker} after {wait_time}s: empty result"
+                )
+                time.sleep(wait_time)
+        except RETRYABLE_EXCEPTIONS as e:
             if attempt < max_retries - 1:
                 wait_time = 2**attempt  # 1, 2, 4 seconds
                 logging.warning(
@@ -118,11 +305,126 @@ def fetch_with_retry(ticker: str, max_retries: int = 3) -> Optional[dict]:
     return None
 
 
-def fetch_earnings_history(ticker: str | int) -> dict:
+def fetch_batch(tickers: list[str | int], chunk_size: int = 200) -> list[dict]:
+    """Fetch financial data for many tickers via batched yf.Tickers calls.
+
+    Constructing one yf.Ticker per symbol triggers a separate HTTPS request
+    per call. yf.Tickers accepts a space-separated symbol string and shares
+    one HTTP session across the batch, amortizing TLS handshakes via
+    keep-alive connections.
+
+    Args:
+        tickers: Stock ticker codes (numeric-only codes get ".T" appended)
+        chunk_size: Number of symbols per yf.Tickers batch (default: 200)
+
+    Returns:
+        List of financial data dictionaries (one per successful ticker).
+        Symbols with an empty info dict fall back to fetch_with_retry.
+    """
+    results: list[dict] = []
+    normalized = normalize_tickers(tickers)
+
+    for start in range(0, len(normalized), chunk_size):
+        chunk = normalized[start : start + chunk_size]
+
+        # Map yfinance symbol -> original ticker code
+        symbol_map = {symbol: orig for orig, symbol in chunk}
+
+        try:
+            batch = yf.Tickers(" ".join(symbol_map), session=_SESSION)
+        except Exception as e:
+            logging.error(f"Failed to construct ticker batch: {e}")
+            batch = None
+
+        for symbol, orig_ticker in symbol_map.items():
+            info: dict = {}
+            if batch is not None:
+                try:
+                    info = batch.tickers[symbol.upper()].info or {}
+                except Exception as e:
+                    logging.warning(f"Batch fetch failed for {symbol}: {e}")
+
+            data = _extract_info_fields(orig_ticker, info) if info else {}
+
+            # Fall back to per-ticker retry path when the batch gave nothing
+            if not data:
+                fallback = fetch_with_retry(orig_ticker)
+                if fallback:
+                    data = fallback
+
+            if data:
+                results.append(data)
+
+    logging.info(f"Batch fetched {len(results)}/{len(normalized)} tickers")
+    return results
+
+
+def fetch_many(
+    tickers: Iterable[str | int],
+    max_workers: int = 16,
+    max_retries: int = 3,
+) -> Iterator[dict]:
+    """Fetch data for multiple tickers concurrently with a bounded thread pool.
+
+    Fetching is I/O-bound (network latency dominates), so running
+    fetch_with_retry in threads collapses total wall time from N x RTT to
+    roughly N x RTT / max_workers. Concurrent requests are capped by a
+    module-level semaphore to avoid Yahoo rate limiting.
+
+    Args:
+        tickers: Stock ticker codes to fetch
+        max_workers: Number of worker threads (default: 16)
+        max_retries: Maximum retry attempts per ticker (default: 3)
+
+    Yields:
+        Financial data dictionaries as they complete (completion order,
+        not input order). Tickers that fail all retries are skipped.
+    """
+
+    def _fetch(ticker: str | int) -> Optional[dict]:
+        with _request_limiter:
+            return fetch_with_retry(ticker, max_retries=max_retries)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_ticker = {executor.submit(_fetch, t): t for t in tickers}
+
+        # Per-ticker logging is DEBUG-only; emit one INFO line roughly
+        # every 1% of completions so progress stays visible without a
+        # logging-lock acquisition per ticker
+        total = len(future_to_ticker)
+        log_interval = max(1, total // 100)
+        completed = 0
+
+        for future in as_completed(future_to_ticker):
+            ticker = future_to_ticker[future]
+            completed += 1
+            if completed % log_interval == 0 or completed == total:
+                logging.info(f"Fetched {completed}/{total} tickers")
+            try:
+                data = future.result()
+            except Exception as e:
+                logging.error(f"Unexpected error fetching {ticker}: {e}")
+                continue
+            if data:
+                yield data
+
+
+def fetch_earnings_history(
+    ticker: str | int,
+    force_refresh: bool = False,
+    yf_symbol: Optional[str] = None,
+    stock: Optional[yf.Ticker] = None,
+) -> dict:
     """Fetch historical earnings data (3 years) from yfinance.
 
+    Results are cached on disk per (ticker, date), same as fetch_ticker_data.
+
     Args:
         ticker: Stock ticker code (can be string or int)
+        force_refresh: Bypass the disk cache and re-fetch (default: False)
+        yf_symbol: Pre-normalized yfinance symbol (e.g. from normalize_tickers)
+        stock: Existing yf.Ticker handle to reuse (defaults to the shared
+               get_ticker cache, same handle as fetch_ticker_data)
 
     Returns:
         Dictionary containing:
@@ -135,12 +437,19 @@ def fetch_earnings_history(ticker: str | int) -> dict:
         # Convert to string if integer
         ticker_str = str(ticker)
 
-        # Auto-append .T suffix for Japanese stocks
-        yf_ticker = ticker_str
-        if ticker_str.isdigit():
+        # Serve from today's disk cache unless a refresh is forced
+        if not force_refresh:
+            cached = _cache_read("earnings", ticker_str)
+            if cached is not None:
+                return cached
+
+        # Auto-append .T suffix for Japanese stocks unless pre-normalized
+        yf_ticker = yf_symbol if yf_symbol is not None else ticker_str
+        if yf_symbol is None and ticker_str.isdigit():
             yf_ticker = f"{ticker_str}.T"
 
-        stock = yf.Ticker(yf_ticker)
+        if stock is None:
+            stock = get_ticker(yf_ticker)
         earnings = stock.earnings  # Annual earnings DataFrame
 
         if earnings is None or earnings.empty:
@@ -164,6 +473,10 @@ def fetch_earnings_history(ticker: str | int) -> dict:
             "earnings_y2": earnings_list[2] if len(earnings_list) > 2 else None,
         }
 
+        # Cache only when at least one year of data came back
+        if any(v is not None for v in result.values()):
+            _cache_write("earnings", ticker_str, result)
+
         logging.debug(f"Fetched earnings history for {ticker}: {result}")
         return result
 
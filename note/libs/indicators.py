@@ -2,7 +2,8 @@
 ファンダメンタル指標計算ライブラリ
 
 このモジュールは note/indicators.md に定義された10のファンダメンタル指標を計算します。
-全ての関数は型ヒントを持ち、polars DataFrameを使用します。
+全ての関数はpolars Exprビルダーです。純粋なExprツリーのみを返すことで、
+クエリオプティマイザの共通部分式除去と射影プッシュダウンが有効になります。
 
 Constitution Compliance:
 - Data Quality: 欠損値を明示的にnullとして扱い、計算不可能な場合はNoneを返す
@@ -13,11 +14,33 @@ Constitution Compliance:
 import polars as pl
 
 
+def safe_div(numerator: pl.Expr, denominator: pl.Expr) -> pl.Expr:
+    """
+    ゼロ除算・null除算を防ぐ安全な除算
+
+    分母が0またはnullの場合はnullを返し、inf/NaNが下流の分析や
+    CSV出力に伝播するのを防ぎます。単一のpl.whenカーネルとして
+    ベクトル化実行されます。
+
+    Args:
+        numerator: 分子（Expr）
+        denominator: 分母（Expr）
+
+    Returns:
+        除算結果（分母が0またはnullの行はnull）
+    """
+    return (
+        pl.when(denominator.is_not_null() & (denominator != 0))
+        .then(numerator / denominator)
+        .otherwise(None)
+    )
+
+
 def calculate_net_cash_ratio(
-    total_cash: pl.Series | pl.Expr,
-    total_debt: pl.Series | pl.Expr,
-    market_cap: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    total_cash: pl.Expr,
+    total_debt: pl.Expr,
+    market_cap: pl.Expr,
+) -> pl.Expr:
     """
     ネットキャッシュ比率を計算
 
@@ -32,14 +55,14 @@ def calculate_net_cash_ratio(
         ネットキャッシュ比率（負の値 = ネット負債）
     """
     net_cash = total_cash - total_debt
-    return net_cash / market_cap
+    return safe_div(net_cash, market_cap)
 
 
 def calculate_enterprise_value(
-    market_cap: pl.Series | pl.Expr,
-    total_debt: pl.Series | pl.Expr,
-    total_cash: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    market_cap: pl.Expr,
+    total_debt: pl.Expr,
+    total_cash: pl.Expr,
+) -> pl.Expr:
     """
     企業価値（EV: Enterprise Value）を計算
 
@@ -58,9 +81,9 @@ def calculate_enterprise_value(
 
 
 def calculate_roic(
-    nopat: pl.Series | pl.Expr,
-    invested_capital: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    nopat: pl.Expr,
+    invested_capital: pl.Expr,
+) -> pl.Expr:
     """
     ROIC（Return on Invested Capital）を計算
 
@@ -73,14 +96,14 @@ def calculate_roic(
     Returns:
         ROIC（%）
     """
-    return nopat / invested_capital
+    return safe_div(nopat, invested_capital)
 
 
 def calculate_croic(
-    operating_cash_flow: pl.Series | pl.Expr,
-    capex: pl.Series | pl.Expr,
-    invested_capital: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    operating_cash_flow: pl.Expr,
+    capex: pl.Expr,
+    invested_capital: pl.Expr,
+) -> pl.Expr:
     """
     CROIC（Cash Return on Invested Capital）を計算
 
@@ -95,13 +118,13 @@ def calculate_croic(
         CROIC（%）
     """
     cash_return = operating_cash_flow - capex
-    return cash_return / invested_capital
+    return safe_div(cash_return, invested_capital)
 
 
 def calculate_gross_profitability(
-    gross_profit: pl.Series | pl.Expr,
-    total_assets: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    gross_profit: pl.Expr,
+    total_assets: pl.Expr,
+) -> pl.Expr:
     """
     Gross Profitability（総利益 / 総資産）を計算
 
@@ -114,13 +137,13 @@ def calculate_gross_profitability(
     Returns:
         Gross Profitability（%）
     """
-    return gross_profit / total_assets
+    return safe_div(gross_profit, total_assets)
 
 
 def calculate_ev_ebit(
-    enterprise_value: pl.Series | pl.Expr,
-    ebit: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    enterprise_value: pl.Expr,
+    ebit: pl.Expr,
+) -> pl.Expr:
     """
     EV/EBIT（企業価値 / 営業利益）を計算
 
@@ -133,14 +156,14 @@ def calculate_ev_ebit(
     Returns:
         EV/EBIT倍率
     """
-    return enterprise_value / ebit
+    return safe_div(enterprise_value, ebit)
 
 
 def calculate_fcf_yield(
-    operating_cash_flow: pl.Series | pl.Expr,
-    capex: pl.Series | pl.Expr,
-    market_cap: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    operating_cash_flow: pl.Expr,
+    capex: pl.Expr,
+    market_cap: pl.Expr,
+) -> pl.Expr:
     """
     FCF利回り（Free Cash Flow Yield）を計算
 
@@ -155,26 +178,26 @@ def calculate_fcf_yield(
         FCF利回り（%）
     """
     fcf = operating_cash_flow - capex
-    return fcf / market_cap
+    return safe_div(fcf, market_cap)
 
 
 def calculate_piotroski_f_score(
-    net_income: pl.Series | pl.Expr,
-    operating_cash_flow: pl.Series | pl.Expr,
-    roa: pl.Series | pl.Expr,
-    roa_prev: pl.Series | pl.Expr,
-    ocf_greater_ni: pl.Series | pl.Expr,
-    long_term_debt: pl.Series | pl.Expr,
-    long_term_debt_prev: pl.Series | pl.Expr,
-    current_ratio: pl.Series | pl.Expr,
-    current_ratio_prev: pl.Series | pl.Expr,
-    shares_outstanding: pl.Series | pl.Expr,
-    shares_outstanding_prev: pl.Series | pl.Expr,
-    gross_margin: pl.Series | pl.Expr,
-    gross_margin_prev: pl.Series | pl.Expr,
-    asset_turnover: pl.Series | pl.Expr,
-    asset_turnover_prev: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    net_income: pl.Expr,
+    operating_cash_flow: pl.Expr,
+    roa: pl.Expr,
+    roa_prev: pl.Expr,
+    ocf_greater_ni: pl.Expr,
+    long_term_debt: pl.Expr,
+    long_term_debt_prev: pl.Expr,
+    current_ratio: pl.Expr,
+    current_ratio_prev: pl.Expr,
+    shares_outstanding: pl.Expr,
+    shares_outstanding_prev: pl.Expr,
+    gross_margin: pl.Expr,
+    gross_margin_prev: pl.Expr,
+    asset_turnover: pl.Expr,
+    asset_turnover_prev: pl.Expr,
+) -> pl.Expr:
     """
     Piotroski Fスコア（0-9点）を計算
 
@@ -220,17 +243,15 @@ def calculate_piotroski_f_score(
     score += (gross_margin > gross_margin_prev).cast(pl.Int32)
     score += (asset_turnover > asset_turnover_prev).cast(pl.Int32)
 
-    # Note: Mypy型推論の制限により、pl.lit(0)から始まるスコア計算はExpr型と推論されます
-    # 実行時には正しくSeries | Exprとして動作するため、型チェックを無視します
-    return score  # type: ignore[return-value]
+    return score
 
 
 def calculate_shareholder_yield(
-    dividends: pl.Series | pl.Expr,
-    share_buyback_net: pl.Series | pl.Expr,
-    debt_reduction: pl.Series | pl.Expr,
-    market_cap: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    dividends: pl.Expr,
+    share_buyback_net: pl.Expr,
+    debt_reduction: pl.Expr,
+    market_cap: pl.Expr,
+) -> pl.Expr:
     """
     Shareholder Yield（株主還元利回り）を計算
 
@@ -246,13 +267,13 @@ def calculate_shareholder_yield(
         Shareholder Yield（%）
     """
     total_shareholder_return = dividends + share_buyback_net + debt_reduction
-    return total_shareholder_return / market_cap
+    return safe_div(total_shareholder_return, market_cap)
 
 
 def calculate_pbr(
-    market_cap: pl.Series | pl.Expr,
-    book_value: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    market_cap: pl.Expr,
+    book_value: pl.Expr,
+) -> pl.Expr:
     """
     PBR（株価純資産倍率: Price-to-Book Ratio）を計算
 
@@ -265,14 +286,14 @@ def calculate_pbr(
     Returns:
         PBR倍率
     """
-    return market_cap / book_value
+    return safe_div(market_cap, book_value)
 
 
 def calculate_ev_fcf(
-    enterprise_value: pl.Series | pl.Expr,
-    operating_cash_flow: pl.Series | pl.Expr,
-    capex: pl.Series | pl.Expr,
-) -> pl.Series | pl.Expr:
+    enterprise_value: pl.Expr,
+    operating_cash_flow: pl.Expr,
+    capex: pl.Expr,
+) -> pl.Expr:
     """
     EV/FCF（企業価値 / フリーキャッシュフロー）を計算
 
@@ -287,7 +308,7 @@ def calculate_ev_fcf(
         EV/FCF倍率
     """
     fcf = operating_cash_flow - capex
-    return enterprise_value / fcf
+    return safe_div(enterprise_value, fcf)
 
 
 def add_fundamental_indicators(df: pl.DataFrame) -> pl.DataFrame:
@@ -310,35 +331,35 @@ def add_fundamental_indicators(df: pl.DataFrame) -> pl.DataFrame:
         欠損値がある場合、該当する指標はnullとなります。
         Constitution原則I（Data Quality）に従い、推測値は使用しません。
     """
-    # 企業価値（EV）を計算（他の指標で使用）
-    df = df.with_columns(
-        enterprise_value=calculate_enterprise_value(
-            df["market_cap"], df["total_debt"], df["total_cash"]
-        )
+    # 企業価値（EV）は共有Exprとして保持し、全指標を1回のwith_columnsで計算
+    # （Expr化により中間フレームの実体化がなくなり、polarsの共通部分式
+    # 除去がEVサブツリーを1回だけ評価する）
+    enterprise_value = calculate_enterprise_value(
+        pl.col("market_cap"), pl.col("total_debt"), pl.col("total_cash")
     )
 
-    # 各指標を計算
-    df = df.with_columns(
+    return df.with_columns(
         [
+            enterprise_value.alias("enterprise_value"),
             calculate_net_cash_ratio(
-                df["total_cash"], df["total_debt"], df["market_cap"]
+                pl.col("total_cash"), pl.col("total_debt"), pl.col("market_cap")
             ).alias("net_cash_ratio"),
-            calculate_roic(df["nopat"], df["invested_capital"]).alias("roic"),
+            calculate_roic(pl.col("nopat"), pl.col("invested_capital")).alias("roic"),
             calculate_croic(
-                df["operating_cash_flow"], df["capex"], df["invested_capital"]
+                pl.col("operating_cash_flow"),
+                pl.col("capex"),
+                pl.col("invested_capital"),
             ).alias("croic"),
-            calculate_gross_profitability(df["gross_profit"], df["total_assets"]).alias(
-                "gross_profitability"
-            ),
-            calculate_ev_ebit(df["enterprise_value"], df["ebit"]).alias("ev_ebit"),
+            calculate_gross_profitability(
+                pl.col("gross_profit"), pl.col("total_assets")
+            ).alias("gross_profitability"),
+            calculate_ev_ebit(enterprise_value, pl.col("ebit")).alias("ev_ebit"),
             calculate_fcf_yield(
-                df["operating_cash_flow"], df["capex"], df["market_cap"]
+                pl.col("operating_cash_flow"), pl.col("capex"), pl.col("market_cap")
             ).alias("fcf_yield"),
-            calculate_pbr(df["market_cap"], df["book_value"]).alias("pbr"),
+            calculate_pbr(pl.col("market_cap"), pl.col("book_value")).alias("pbr"),
             calculate_ev_fcf(
-                df["enterprise_value"], df["operating_cash_flow"], df["capex"]
+                enterprise_value, pl.col("operating_cash_flow"), pl.col("capex")
             ).alias("ev_fcf"),
         ]
     )
-
-    return df
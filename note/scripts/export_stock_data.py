@@ -11,7 +11,7 @@ import sys
 from pathlib import Path
 
 import fire
-from tqdm import tqdm
+from tqdm.contrib.concurrent import thread_map
 
 from note.libs import csv_exporter, data_fetcher
 
@@ -30,6 +30,8 @@ def export_data(
     limit: int | None = None,
     output: str = "note/data/exports/",
     include_etf: bool = False,
+    threads: int = 8,
+    force_refresh: bool = False,
 ) -> None:
     """Export stock data with fundamental indicators to CSV.
 
@@ -38,6 +40,8 @@ def export_data(
         limit: Maximum number of stocks to process (default: None for all)
         output: Output directory for CSV files (default: note/data/exports/)
         include_etf: Include ETF/ETN in processing (default: False, individual stocks only)
+        threads: Number of worker threads for fetching (default: 8)
+        force_refresh: Clear the yfinance disk cache and re-fetch everything (default: False)
     """
     logging.info("Starting stock data export process")
     logging.info(f"Input file: {input}")
@@ -69,22 +73,39 @@ def export_data(
         logging.error("No tickers found. Exiting.")
         sys.exit(1)
 
-    # Step 2: Fetch financial data for each ticker with retry logic
-    logging.info(f"Fetching data for {len(tickers)} tickers...")
-    ticker_data_list = []
-
-    # Fetch data for each ticker with progress bar
-    for ticker in tqdm(tickers, desc="Fetching stock data", unit="stock"):
-        data = data_fetcher.fetch_with_retry(ticker, max_retries=3)
-        if data:
-            # Step 2.5: Fetch earnings history (3 years)
-            earnings_data = data_fetcher.fetch_earnings_history(ticker)
-            # Merge earnings data into main data dict
-            data.update(earnings_data)
-            ticker_data_list.append(data)
+    n_tickers = len(tickers)
+
+    if force_refresh:
+        data_fetcher.clear_cache()
+
+    # Step 2: Fetch financial data for each ticker with retry logic.
+    # The work is I/O-bound (HTTP round-trips to Yahoo), so a thread pool
+    # overlaps the requests; data_fetcher's semaphore caps in-flight calls.
+    logging.info(f"Fetching data for {n_tickers} tickers using {threads} threads...")
+
+    def _fetch(ticker: str) -> dict | None:
+        # Acquire the shared limiter so --threads above
+        # MAX_CONCURRENT_REQUESTS cannot exceed the rate-limit cap
+        with data_fetcher._request_limiter:
+            data = data_fetcher.fetch_with_retry(ticker, max_retries=3)
+            if data:
+                # Merge earnings history (3 years) into main data dict
+                data.update(data_fetcher.fetch_earnings_history(ticker))
+        return data or None
+
+    # thread_map = ThreadPoolExecutor + tqdm in one call, and it returns
+    # results in input order so the exported rows follow the TSV ordering
+    fetch_results = thread_map(
+        _fetch,
+        tickers,
+        max_workers=threads,
+        desc="Fetching stock data",
+        unit="stock",
+    )
+    ticker_data_list = [data for data in fetch_results if data]
 
     logging.info(
-        f"Successfully fetched data for {len(ticker_data_list)}/{len(tickers)} tickers"
+        f"Successfully fetched data for {len(ticker_data_list)}/{n_tickers} tickers"
     )
 
     if not ticker_data_list:
@@ -94,20 +115,17 @@ def export_data(
     # Step 3: Build DataFrame from fetched data
     df = csv_exporter.build_dataframe(ticker_data_list)
 
-    # Step 3.5: Merge TSV metadata (stock name, sector, market category)
-    df_with_metadata = csv_exporter.merge_tsv_metadata(df, tsv_path=input)
-
-    # Step 4: Calculate and add indicators
-    df_with_indicators = csv_exporter.add_indicators_to_dataframe(df_with_metadata)
-
-    # Step 4.5: Add earnings growth flags
-    df_with_earnings_flags = csv_exporter.add_earnings_flags(df_with_indicators)
-
-    # Step 4.7: Reorder columns for better readability
-    df_final = csv_exporter.reorder_columns(df_with_earnings_flags)
-
-    # Step 5: Export to CSV
-    output_path = csv_exporter.export_to_csv(df_final, output_dir=output)
+    # Steps 3.5-4.7 build one lazy plan (metadata merge, indicators,
+    # earnings flags, column reorder) that polars optimizes and streams
+    # straight into the CSV writer without materializing intermediates
+    lazy_df = df.lazy()
+    lazy_df = csv_exporter.merge_tsv_metadata(lazy_df, tsv_path=input)
+    lazy_df = csv_exporter.add_indicators_to_dataframe(lazy_df)
+    lazy_df = csv_exporter.add_earnings_flags(lazy_df)
+    lazy_df = csv_exporter.reorder_columns(lazy_df)
+
+    # Step 5: Export to CSV (sink_csv executes the plan while writing)
+    output_path = csv_exporter.export_to_csv(lazy_df, output_dir=output)
 
     logging.info(f"Export complete! File saved to: {output_path}")
     print(f"\nExport complete! File saved to: {output_path}")
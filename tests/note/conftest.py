@@ -0,0 +1,31 @@
+"""Shared pytest fixtures for the note test suite."""
+
+import pytest
+
+# Importing data_fetcher here pulls in yfinance (and with it pandas and
+# numpy) once per worker process during conftest loading — i.e. at pytest
+# startup, before any test or collection timing — so no individual test
+# pays the cold-import cost
+from note.libs import data_fetcher
+
+
+@pytest.fixture(autouse=True)
+def _isolate_yf_disk_cache(tmp_path, monkeypatch):
+    """Redirect the yfinance disk cache to a per-test temporary directory.
+
+    Keeps tests from reading stale entries written by earlier tests (or
+    real CLI runs) and from polluting note/.cache/ in the repository.
+    """
+    monkeypatch.setattr(data_fetcher, "_CACHE_DIR", tmp_path / "yf-cache")
+
+
+@pytest.fixture(autouse=True)
+def _reset_ticker_lru_cache():
+    """Clear the get_ticker LRU cache around every test.
+
+    Tests patch yf.Ticker with mocks; without clearing, a cached mock
+    handle from one test would leak into the next.
+    """
+    data_fetcher.get_ticker.cache_clear()
+    yield
+    data_fetcher.get_ticker.cache_clear()
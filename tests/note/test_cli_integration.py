@@ -1,4 +1,9 @@
-"""Integration tests for the export_stock_data CLI."""
+"""Integration tests for the export_stock_data CLI.
+
+The network-facing fetchers are replaced with deterministic fakes, so
+these tests exercise the full pipeline (TSV parsing, DataFrame build,
+metadata merge, indicators, CSV export) without hitting Yahoo.
+"""
 
 import os
 import tempfile
@@ -7,6 +12,45 @@ from pathlib import Path
 import polars as pl
 import pytest
 
+from note.libs import data_fetcher
+
+
+@pytest.fixture(autouse=True)
+def _mock_data_fetcher(monkeypatch):
+    """Stub the yfinance fetchers with deterministic in-memory data."""
+
+    def fake_fetch_with_retry(ticker, max_retries=3, force_refresh=False):
+        return {
+            "ticker": str(ticker),
+            "market_cap": 1_000_000_000.0,
+            "total_cash": 300_000_000.0,
+            "total_debt": 100_000_000.0,
+            "total_assets": 2_000_000_000.0,
+            "book_value": 700_000_000.0,
+            "operating_cash_flow": 150_000_000.0,
+            "capex": 50_000_000.0,
+            "ebit": 120_000_000.0,
+            "gross_profit": 400_000_000.0,
+            "net_income": 80_000_000.0,
+            "dividend_yield": 0.03,
+            "trailing_pe": 12.5,
+            "total_revenue": 1_500_000_000.0,
+            "earnings_growth": 0.1,
+            "payout_ratio": 0.35,
+        }
+
+    def fake_fetch_earnings_history(ticker, force_refresh=False, yf_symbol=None):
+        return {
+            "earnings_y0": 80_000_000.0,
+            "earnings_y1": 70_000_000.0,
+            "earnings_y2": 60_000_000.0,
+        }
+
+    monkeypatch.setattr(data_fetcher, "fetch_with_retry", fake_fetch_with_retry)
+    monkeypatch.setattr(
+        data_fetcher, "fetch_earnings_history", fake_fetch_earnings_history
+    )
+
 
 def test_cli_with_mock_input_file(tmp_path: Path) -> None:
     """Test CLI with a mock TSV input file and verify CSV output is created."""
@@ -1,101 +1,194 @@
 """Unit tests for the data_fetcher module."""
 
 import time
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import call, patch
 
 import pytest
 
-
-def test_retry_logic_with_exponential_backoff() -> None:
-    """Test that fetch_with_retry attempts multiple times and returns None on failure."""
-    from note.libs.data_fetcher import fetch_with_retry
-
-    # Mock fetch_ticker_data to always return empty dict (failure)
-    with patch("note.libs.data_fetcher.fetch_ticker_data") as mock_fetch:
-        mock_fetch.return_value = {}  # Simulate failure (empty dict)
-
-        result = fetch_with_retry("TEST.T", max_retries=3)
-
-        # Verify it was called 3 times (initial + 2 retries)
-        assert mock_fetch.call_count == 3, "Should attempt 3 times total"
-
-        # Verify result is None after all retries failed
-        assert result is None, "Should return None after all retries fail"
-
-
-def test_retry_logic_succeeds_on_second_attempt() -> None:
-    """Test that retry logic stops retrying once it succeeds."""
-    from note.libs.data_fetcher import fetch_with_retry
-
-    # Mock fetch_ticker_data to fail first time, succeed second time
+from note.libs import data_fetcher
+
+# Under pytest -n auto (pytest-xdist) the module patches shared
+# data_fetcher attributes, so keep all of its tests on one worker;
+# different test files still run in parallel
+pytestmark = pytest.mark.xdist_group("data_fetcher_mocks")
+
+# Shared read-only payloads for the fakes. MappingProxyType makes them
+# immutable, so one test mutating .info cannot corrupt another
+# parametrized case reusing the same object
+_INFO_FULL = MappingProxyType(
+    {"marketCap": 1000000000, "totalCash": 50000000, "totalDebt": 30000000}
+)
+_INFO_BATCH = MappingProxyType({"marketCap": 1000000000, "totalCash": 50000000})
+_INFO_MINIMAL = MappingProxyType({"marketCap": 1000000})
+
+
+class _FakeTicker:
+    """Dict-backed stand-in for yf.Ticker: .info is a plain attribute.
+
+    __slots__ skips the per-instance dict, and plain attribute access
+    avoids Mock's attribute protocol on the hot .info reads.
+    """
+
+    __slots__ = ("info",)
+
+    def __init__(self, info) -> None:
+        self.info = info
+
+
+# Pre-built failure for the exception path. RuntimeError rather than bare
+# Exception so the test keeps passing if the SUT ever narrows its except
+# clause to concrete error types
+_API_ERR = RuntimeError("API Error")
+
+
+@pytest.fixture(autouse=True)
+def mock_sleep():
+    """Patch data_fetcher's time.sleep so no test blocks on retry backoff.
+
+    Yields the sleep mock so retry tests can assert the backoff schedule.
+    """
+    with patch("note.libs.data_fetcher.time.sleep") as mock:
+        yield mock
+
+
+@pytest.mark.parametrize(
+    ("fetch_results", "expected_calls", "expected_sleeps", "expect_success"),
+    [
+        pytest.param(
+            [{}, {}, {}],
+            3,
+            [call(1), call(2)],
+            False,
+            id="all-attempts-fail",
+        ),
+        pytest.param(
+            [{}, {"ticker": "TEST.T", "market_cap": 1000000}],
+            2,
+            [call(1)],
+            True,
+            id="succeeds-on-second-attempt",
+        ),
+    ],
+)
+# Guard against a real time.sleep sneaking back in: an unpatched
+# exponential backoff would make this test take seconds, not milliseconds
+@pytest.mark.timeout(2)
+def test_retry_logic(
+    mock_sleep, fetch_results, expected_calls, expected_sleeps, expect_success
+) -> None:
+    """Test fetch_with_retry attempt counts, backoff schedule, and results."""
     with patch("note.libs.data_fetcher.fetch_ticker_data") as mock_fetch:
-        mock_fetch.side_effect = [
-            {},  # First attempt fails (empty dict)
-            {"ticker": "TEST.T", "market_cap": 1000000},  # Second attempt succeeds
-        ]
+        mock_fetch.side_effect = fetch_results
 
-        result = fetch_with_retry("TEST.T", max_retries=3)
+        result = data_fetcher.fetch_with_retry("TEST.T", max_retries=3)
 
-        # Verify it was called exactly 2 times (stopped after success)
-        assert mock_fetch.call_count == 2, "Should stop retrying after success"
-
-        # Verify result is the successful data
-        assert result is not None, "Should return data on success"
-        assert result["ticker"] == "TEST.T", "Should return correct ticker data"
-
-
-def test_fetch_ticker_data_handles_exceptions() -> None:
-    """Test that fetch_ticker_data catches and logs exceptions."""
-    from note.libs.data_fetcher import fetch_ticker_data
+        # Attempts stop at success, or exhaust max_retries on failure;
+        # inspecting call_args_list also verifies the ticker propagates
+        # unchanged into every attempt
+        calls = mock_fetch.call_args_list
+        assert len(calls) == expected_calls
+        assert all(c == call("TEST.T", force_refresh=False) for c in calls), (
+            "Every attempt should fetch the same ticker"
+        )
 
-    # Mock yfinance.Ticker to raise an exception
-    with patch("note.libs.data_fetcher.yf.Ticker") as mock_ticker:
-        mock_ticker.side_effect = Exception("API Error")
+        # Exponential backoff runs only between failed attempts
+        assert mock_sleep.call_args_list == expected_sleeps, (
+            "Should back off exponentially between failed attempts"
+        )
 
-        # Should not raise, should return empty dict
-        result = fetch_ticker_data("INVALID.T")
+        if expect_success:
+            assert result is not None, "Should return data on success"
+            assert result["ticker"] == "TEST.T", "Should return correct ticker data"
+        else:
+            assert result is None, "Should return None after all retries fail"
 
-        assert result == {}, "Should return empty dict when exception occurs"
 
+def test_fetch_many_collects_all_successful_results() -> None:
+    """Test that fetch_many returns data for every ticker, skipping failures."""
 
-def test_fetch_ticker_data_returns_dict_on_success() -> None:
-    """Test that fetch_ticker_data returns a dict with expected fields."""
-    from note.libs.data_fetcher import fetch_ticker_data
+    # Mock fetch_with_retry: one ticker fails (None), others succeed
+    def fake_fetch(ticker, max_retries=3):
+        if ticker == "9999":
+            return None
+        return {"ticker": ticker, "market_cap": 1000000}
 
-    # Mock yfinance.Ticker to return valid data
-    with patch("note.libs.data_fetcher.yf.Ticker") as mock_ticker_class:
-        mock_ticker = MagicMock()
-        mock_ticker.info = {
-            "marketCap": 1000000000,
-            "totalCash": 50000000,
-            "totalDebt": 30000000,
-        }
-        mock_ticker_class.return_value = mock_ticker
+    with patch("note.libs.data_fetcher.fetch_with_retry", side_effect=fake_fetch):
+        results = list(data_fetcher.fetch_many(["7203", "9999", "9984"], max_workers=2))
 
-        result = fetch_ticker_data("7203")
+    # Verify failed ticker is skipped and successes are all present
+    assert len(results) == 2, "Should yield results only for successful tickers"
+    fetched_tickers = {d["ticker"] for d in results}
+    assert fetched_tickers == {"7203", "9984"}, "Should fetch both valid tickers"
 
-        assert result is not None, "Should return data dict on success"
-        assert isinstance(result, dict), "Should return a dictionary"
-        assert "ticker" in result, "Should include ticker field"
-        assert result["ticker"] == "7203", "Should preserve original ticker code"
 
+def test_fetch_batch_uses_single_tickers_call() -> None:
+    """Test that fetch_batch fetches a chunk through one yf.Tickers call."""
+    with patch("note.libs.data_fetcher.yf.Tickers") as mock_tickers_class:
+        fake_ticker = _FakeTicker(_INFO_BATCH)
+        mock_tickers_class.return_value = SimpleNamespace(
+            tickers={"7203.T": fake_ticker, "9984.T": fake_ticker}
+        )
 
-def test_japanese_ticker_suffix_handling() -> None:
-    """Test that numeric ticker codes get .T suffix added for yfinance."""
-    from note.libs.data_fetcher import fetch_ticker_data
+        results = data_fetcher.fetch_batch(["7203", "9984"])
 
-    with patch("note.libs.data_fetcher.yf.Ticker") as mock_ticker_class:
-        mock_ticker = MagicMock()
-        mock_ticker.info = {"marketCap": 1000000}
-        mock_ticker_class.return_value = mock_ticker
+        # Both symbols should come from a single batched yf.Tickers call
+        # over the shared pooled session
+        assert mock_tickers_class.call_args_list == [
+            call("7203.T 9984.T", session=data_fetcher._SESSION)
+        ]
+        assert len(results) == 2, "Should return data for both tickers"
+        assert {d["ticker"] for d in results} == {"7203", "9984"}
 
-        # Test with numeric ticker (should add .T)
-        result = fetch_ticker_data("7203")
 
-        # Verify yfinance.Ticker was called with .T suffix
-        mock_ticker_class.assert_called_once_with("7203.T")
+def test_fetch_ticker_data_handles_exceptions(monkeypatch) -> None:
+    """Test that fetch_ticker_data catches and logs exceptions."""
 
-        # Verify returned ticker preserves original code
-        assert result["ticker"] == "7203", (
-            "Should return original ticker code without .T"
-        )
+    # Make yfinance.Ticker raise; a plain function is enough since nothing
+    # asserts on the constructor itself
+    def raise_api_error(symbol, session=None):
+        raise _API_ERR
+
+    monkeypatch.setattr(data_fetcher.yf, "Ticker", raise_api_error)
+
+    # Should not raise, should return empty dict
+    result = data_fetcher.fetch_ticker_data("INVALID.T")
+
+    assert result == {}, "Should return empty dict when exception occurs"
+
+
+@pytest.mark.parametrize(
+    ("ticker", "expected_symbol", "info"),
+    [
+        pytest.param(
+            "7203",
+            "7203.T",
+            _INFO_FULL,
+            id="numeric-gets-t-suffix",
+        ),
+        pytest.param(
+            "9984.T",
+            "9984.T",
+            _INFO_MINIMAL,
+            id="suffixed-passes-through",
+        ),
+    ],
+)
+def test_fetch_ticker_data_success(monkeypatch, ticker, expected_symbol, info) -> None:
+    """Test successful fetches: symbol normalization and returned fields."""
+    # Closure-based fake: records constructor calls without mock machinery
+    calls: list[tuple] = []
+
+    def fake_ticker(symbol, session=None):
+        calls.append((symbol, session))
+        return _FakeTicker(info)
+
+    monkeypatch.setattr(data_fetcher.yf, "Ticker", fake_ticker)
+
+    result = data_fetcher.fetch_ticker_data(ticker)
+
+    # Verify the yfinance symbol passed on, over the shared pooled session
+    assert calls == [(expected_symbol, data_fetcher._SESSION)]
+
+    assert isinstance(result, dict), "Should return a dictionary"
+    assert result["ticker"] == ticker, "Should preserve original ticker code"